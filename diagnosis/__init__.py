@@ -0,0 +1,4 @@
+# Shared disease configuration and model loading for the AI Medical Diagnosis Center
+from diagnosis.config import CONFIG
+# The shared instance lives at diagnosis.registry.registry; re-exporting it here would hide the submodule
+from diagnosis.registry import ModelRegistry
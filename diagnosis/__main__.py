@@ -0,0 +1,152 @@
+import argparse
+import sys
+import time
+
+from diagnosis.api import BATCH_WAIT, MAX_BATCH
+from diagnosis.batch import CHUNK_SIZE, ENGINES, score_csv
+from diagnosis.config import CONFIG
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m diagnosis", description="Headless tools for the AI Medical Diagnosis Center.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    score = subparsers.add_parser("score", help="score a CSV of patient records with one disease model")
+    score.add_argument("--disease", required=True, choices=list(CONFIG))
+    score.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows predicted per batch (default: %(default)s)")
+    score.add_argument("-j", "--jobs", type=int, default=1, help="worker processes to predict on, 0 for all cores (default: %(default)s)")
+    score.add_argument("--engine", choices=ENGINES, default="sklearn", help="numpy evaluates a compiled copy of the trees (default: %(default)s)")
+    score.add_argument("--validate", action="store_true", help="check every row against the form's input rules and add an errors column")
+    score.add_argument("input", help="CSV with one column per feature (names from CONFIG features or input labels)")
+    score.add_argument("output", help="CSV to write: the input rows plus a prediction column")
+
+    serve = subparsers.add_parser("serve", help="run the HTTP/JSON prediction API (POST /predict/{disease})")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--batch-wait-ms", type=float, default=BATCH_WAIT * 1000, help="how long a request waits to share a predict call (default: %(default)s)")
+    serve.add_argument("--max-batch", type=int, default=MAX_BATCH, help="rows per predict call at most (default: %(default)s)")
+    serve.add_argument("--engine", choices=ENGINES, default="sklearn", help="numpy evaluates a compiled copy of the trees (default: %(default)s)")
+
+    subparsers.add_parser("check-engine", help="check the compiled NumPy engine against every model on the bundled datasets")
+
+    subparsers.add_parser("convert-models", help="write a verified, memory-mappable .forest copy of every model next to its .sav")
+
+    startup = subparsers.add_parser("startup-profile", help="time a cold start of app.py: imports, model loads and first renders")
+    startup.add_argument("--json", action="store_true", help="print the raw stages as JSON")
+
+    bench = subparsers.add_parser("bench", help="benchmark load time, latency, throughput and memory for every model")
+    bench.add_argument("--disease", action="append", choices=list(CONFIG), help="only benchmark this disease (repeatable)")
+    bench.add_argument("--engine", choices=ENGINES, default="sklearn")
+    bench.add_argument("--repeat", type=int, default=200, help="single-row predictions timed per model (default: %(default)s)")
+    bench.add_argument("--output", help="write the results as JSON to this file")
+    bench.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    bench.add_argument("--threshold", type=float, default=0.2, help="fail when a metric is worse than the baseline by more than this fraction (default: %(default)s)")
+
+    evaluate = subparsers.add_parser("evaluate", help="score every model against its cleaned, cached dataset and report accuracy and timing")
+    evaluate.add_argument("--disease", action="append", choices=list(CONFIG), help="only evaluate this disease (repeatable)")
+    evaluate.add_argument("--engine", choices=ENGINES, default="sklearn")
+    evaluate.add_argument("--batch-size", type=int, default=4096, help="rows predicted per call (default: %(default)s)")
+    evaluate.add_argument("--rebuild", action="store_true", help="re-parse the CSVs even when a cached copy exists")
+
+    audit = subparsers.add_parser("audit", help="print logged predictions as CSV")
+    audit.add_argument("--disease", choices=list(CONFIG), help="only this disease's predictions")
+    audit.add_argument("--columns", default="timestamp,disease,source,result,model_hash", help="comma-separated columns to read; inputs prints the feature values (default: %(default)s)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "score":
+        start = time.perf_counter()
+        try:
+            rows, invalid = score_csv(args.disease, args.input, args.output, chunk_size=args.chunk_size, jobs=args.jobs, engine=args.engine, validate=args.validate)
+        except (FileNotFoundError, ValueError) as e:
+            parser.error(str(e))
+        print(f"Scored {rows} rows for {args.disease} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        if invalid:
+            print(f"{invalid} rows failed validation; see the errors column", file=sys.stderr)
+    elif args.command == "serve":
+        import asyncio
+
+        from diagnosis.api import serve
+
+        print(f"Serving predictions on http://{args.host}:{args.port}/predict/<disease>", file=sys.stderr)
+        asyncio.run(serve(args.port, args.host, max_wait=args.batch_wait_ms / 1000, max_batch=args.max_batch, engine=args.engine))
+    elif args.command == "check-engine":
+        from diagnosis.engine import check_all
+
+        return 0 if check_all() else 1
+    elif args.command == "convert-models":
+        from diagnosis.artifact import convert_all
+
+        return 0 if convert_all() else 1
+    elif args.command == "startup-profile":
+        import json
+
+        from diagnosis.startup import profile, report
+
+        stages = profile()
+        if args.json:
+            print(json.dumps(stages, indent=2))
+        else:
+            report(stages)
+    elif args.command == "bench":
+        import json
+
+        from diagnosis import bench as benchmarks
+
+        results = benchmarks.run(args.disease, engine=args.engine, repeat=args.repeat)
+        benchmarks.report(results)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            try:
+                regressions = benchmarks.compare(results, baseline, args.threshold)
+            except ValueError as e:
+                parser.error(str(e))
+            for change in benchmarks.environment_changes(results, baseline):
+                print(f"WARNING environment differs from the baseline, {change}", file=sys.stderr)
+            for regression in regressions:
+                print(f"REGRESSION {regression}", file=sys.stderr)
+            if regressions:
+                return 1
+    elif args.command == "evaluate":
+        from diagnosis import datasets
+
+        try:
+            if args.rebuild:
+                for disease in args.disease or CONFIG:
+                    datasets.clear(disease)
+            datasets.report(datasets.run(args.disease, engine=args.engine, batch_size=args.batch_size))
+        except (FileNotFoundError, ValueError) as e:
+            parser.error(str(e))
+    elif args.command == "audit":
+        import csv
+
+        import numpy as np
+
+        from diagnosis.audit import COLUMNS, read
+
+        columns = args.columns.split(",")
+        unknown = [column for column in columns if column not in COLUMNS]
+        if unknown:
+            parser.error(f"unknown column(s) {', '.join(unknown)}; choose from {', '.join(COLUMNS)}")
+        records = read(columns, disease=args.disease)
+        writer = csv.writer(sys.stdout)
+        writer.writerow(columns)
+        for i in range(len(records[columns[0]])):
+            row = []
+            for column in columns:
+                value = records[column][i]
+                if column == "timestamp":
+                    value = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(value))
+                elif column == "inputs":
+                    value = " ".join(f"{x:g}" for x in value[~np.isnan(value)])
+                row.append(value)
+            writer.writerow(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+import asyncio
+import json
+
+import pandas as pd
+import tornado.web
+
+from diagnosis.audit import audit_log
+from diagnosis.batch import feature_frame, match_columns, models_for
+from diagnosis.config import CONFIG
+from diagnosis.inference import predict, result_text
+from diagnosis.metrics import metrics
+from diagnosis.registry import registry
+from diagnosis.schema import SCHEMAS
+from diagnosis.screening import screen
+
+# Defaults for how long a request may wait for others to share its predict call
+BATCH_WAIT = 0.005
+MAX_BATCH = 256
+
+
+class MicroBatcher:
+    """Collects concurrent rows for one disease and predicts them with a single call.
+
+    The first row of a batch starts a timer of max_wait seconds; the batch is predicted
+    when the timer fires or max_batch rows have arrived, whichever comes first.
+    """
+
+    def __init__(self, disease, max_wait=BATCH_WAIT, max_batch=MAX_BATCH, engine="sklearn"):
+        self.disease = disease
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self.engine = engine
+        self._rows = []
+        self._futures = []
+        self._timer = None
+
+    def submit(self, row):
+        """Queue a row (values in CONFIG feature order) and return a future for its prediction."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._rows.append(row)
+        self._futures.append(future)
+        if len(self._rows) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        rows, futures = self._rows, self._futures
+        self._rows, self._futures = [], []
+        asyncio.ensure_future(self._predict(rows, futures))
+
+    async def _predict(self, rows, futures):
+        loop = asyncio.get_running_loop()
+        try:
+            predictions = await loop.run_in_executor(None, self._predict_rows, rows)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+        else:
+            for future, prediction in zip(futures, predictions):
+                future.set_result(int(prediction))
+
+    def _predict_rows(self, rows):
+        with metrics.timer("api_batch", self.disease):
+            features = CONFIG[self.disease]["features"]
+            chunk = pd.DataFrame(rows, columns=features)
+            frame = feature_frame(self.disease, chunk, {feature: feature for feature in features})
+            model, compiled = models_for(self.disease, self.engine)
+            predictions = predict(self.disease, model, frame, compiled)
+        audit_log.record_batch(self.disease, frame.to_numpy(dtype=float), predictions, [result_text(self.disease, p) for p in predictions], "api")
+        metrics.inc("diagnosis_api_batches_total", disease=self.disease)
+        metrics.inc("diagnosis_predictions_total", len(rows), disease=self.disease, source="api")
+        return predictions
+
+
+class PredictHandler(tornado.web.RequestHandler):
+    """POST /predict/{disease} with a JSON object of features (or form labels), or a list of them."""
+
+    def initialize(self, batchers):
+        self.batchers = batchers
+
+    async def post(self, disease):
+        if disease not in CONFIG:
+            raise tornado.web.HTTPError(404, reason=f"Unknown disease: {disease}")
+        try:
+            body = json.loads(self.request.body)
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="Body must be JSON")
+        records = body if isinstance(body, list) else [body]
+        rows = []
+        for record in records:
+            if not isinstance(record, dict):
+                raise tornado.web.HTTPError(400, reason="Each record must be a JSON object")
+            try:
+                mapping = match_columns(disease, list(record))
+            except ValueError as e:
+                raise tornado.web.HTTPError(400, reason=str(e))
+            rows.append([record[mapping[feature]] for feature in CONFIG[disease]["features"]])
+        _, errors = SCHEMAS[disease].check_rows(rows)
+        if errors:
+            reason = "; ".join(f"Record {i}: {', '.join(messages)}" for i, messages in errors.items())
+            raise tornado.web.HTTPError(400, reason=reason)
+
+        batcher = self.batchers[disease]
+        try:
+            predictions = await asyncio.gather(*(batcher.submit(row) for row in rows))
+        except FileNotFoundError as e:
+            raise tornado.web.HTTPError(503, reason=f"Model unavailable: {e}")
+        except ValueError as e:
+            raise tornado.web.HTTPError(400, reason=str(e))
+        results = [{"prediction": p, "result": result_text(disease, p)} for p in predictions]
+        self.write({"disease": disease, "results": results} if isinstance(body, list) else {"disease": disease, **results[0]})
+
+    def write_error(self, status_code, **kwargs):
+        self.finish({"error": self._reason})
+
+
+class ScreenHandler(tornado.web.RequestHandler):
+    """POST /screen with one unified patient record; runs every disease it has inputs for.
+
+    Repeat ?disease=... to limit which diseases are screened.
+    """
+
+    async def post(self):
+        diseases = self.get_query_arguments("disease") or None
+        unknown = [disease for disease in diseases or () if disease not in CONFIG]
+        if unknown:
+            raise tornado.web.HTTPError(404, reason=f"Unknown disease: {', '.join(unknown)}")
+        try:
+            record = json.loads(self.request.body)
+        except ValueError:
+            raise tornado.web.HTTPError(400, reason="Body must be JSON")
+        if not isinstance(record, dict):
+            raise tornado.web.HTTPError(400, reason="Body must be a JSON object")
+        results = await asyncio.get_running_loop().run_in_executor(None, screen, record, diseases)
+        self.write({"results": results})
+
+    def write_error(self, status_code, **kwargs):
+        self.finish({"error": self._reason})
+
+
+class MetricsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header("Content-Type", "text/plain; version=0.0.4")
+        self.write(metrics.render())
+
+
+class HealthHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.write({"status": "ok", "loaded": [disease for disease in CONFIG if registry.is_loaded(disease)]})
+
+
+def make_app(max_wait=BATCH_WAIT, max_batch=MAX_BATCH, engine="sklearn"):
+    batchers = {disease: MicroBatcher(disease, max_wait, max_batch, engine) for disease in CONFIG}
+    return tornado.web.Application([
+        (r"/predict/([^/]+)", PredictHandler, {"batchers": batchers}),
+        (r"/screen", ScreenHandler),
+        (r"/metrics", MetricsHandler),
+        (r"/health", HealthHandler),
+    ])
+
+
+async def serve(port, address="127.0.0.1", max_wait=BATCH_WAIT, max_batch=MAX_BATCH, engine="sklearn"):
+    make_app(max_wait, max_batch, engine).listen(port, address)
+    await asyncio.Event().wait()
@@ -0,0 +1,206 @@
+"""Compact, memory-mappable copies of the pickled forests.
+
+convert() writes a model's node table to a .forest file next to its .sav:
+MAGIC, a little-endian uint32 header length, a JSON header (classes, feature
+names, source pickle SHA-256 and each array's dtype, shape and offset), then the
+arrays at 64-byte aligned offsets after it. Children are int32, features int16, missing
+directions uint8 and thresholds float32. Leaf values stay float64 so class
+probabilities sum exactly as in sklearn.
+
+Each float32 threshold is the largest float32 not above the float64 one. sklearn
+compares float32 inputs, and for any float32 x, x <= t32 holds exactly when
+x <= t64, so no split decision changes.
+
+MappedForest maps the file read-only: every process shares the same page-cache
+pages, and nothing is unpickled. load_verified() accepts a .forest file only once
+its predictions have matched the original pickle on the bundled dataset. The
+result is recorded in a .verified stamp so other workers skip the check.
+"""
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+
+import numpy as np
+
+from diagnosis.config import CONFIG
+from diagnosis.engine import CompiledForest, verify
+from diagnosis.inference import _check_feature_names
+from diagnosis.registry import registry
+
+MAGIC = b"DXF1"
+ALIGN = 64
+
+
+def forest_path(disease):
+    """Where disease's converted model lives: its .sav path with a .forest extension."""
+    return os.path.splitext(registry.path(disease))[0] + ".forest"
+
+
+def _stamp_path(path):
+    return path + ".verified"
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _align(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _floor_float32(threshold):
+    rounded = threshold.astype(np.float32)
+    above = rounded.astype(np.float64) > threshold
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+class MappedForest(CompiledForest):
+    """A CompiledForest whose arrays are read-only views of a memory-mapped .forest file.
+
+    It stands in for the sklearn model: predict accepts the same frames (feature
+    names are checked the same way) and it is its own compiled form.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < 8 or self._mmap[:4] != MAGIC:
+            raise ValueError(f"{path} is not a .forest file")
+        length = struct.unpack("<I", self._mmap[4:8])[0]
+        header = json.loads(self._mmap[8:8 + length])
+        start = _align(8 + length)
+        self.path = path
+        self.disease = header["disease"]
+        self.source_sha256 = header["source_sha256"]
+        self.depth = header["depth"]
+        self.n_features = self.n_features_in_ = header["n_features"]
+        self.classes = self.classes_ = np.array(header["classes"])
+        self.n_outputs_ = 1
+        if header["feature_names"] is not None:
+            self.feature_names = self.feature_names_in_ = np.array(header["feature_names"], dtype=object)
+        else:
+            self.feature_names = None
+        for name, (dtype, shape, offset) in header["arrays"].items():
+            count = int(np.prod(shape))
+            setattr(self, name, np.frombuffer(self._mmap, dtype=dtype, count=count, offset=start + offset).reshape(shape))
+
+    def predict(self, X):
+        if hasattr(X, "columns"):
+            if self.feature_names is not None:
+                _check_feature_names(self.disease, self, X.columns)
+            X = X.to_numpy(dtype=np.float32)
+        return super().predict(X)
+
+
+def write(disease, model, path, source_sha256):
+    """Write disease's model (a fitted forest classifier) to path in the .forest format."""
+    compiled = CompiledForest(model)
+    if compiled.n_features >= np.iinfo(np.int16).max:
+        raise ValueError(f"{path}: too many features for the int16 feature column")
+    arrays = {
+        "roots": compiled.roots.astype(np.int32),
+        "left": compiled.left.astype(np.int32),
+        "right": compiled.right.astype(np.int32),
+        "feature": compiled.feature.astype(np.int16),
+        "threshold": _floor_float32(compiled.threshold),
+        "missing_left": compiled.missing_left.astype(np.uint8),
+        "value": compiled.value.astype(np.float64),
+    }
+    header = {
+        "disease": disease,
+        "source_sha256": source_sha256,
+        "depth": int(compiled.depth),
+        "n_features": int(compiled.n_features),
+        "classes": compiled.classes.tolist(),
+        "feature_names": None if compiled.feature_names is None else [str(name) for name in compiled.feature_names],
+        "arrays": {},
+    }
+    # Offsets are relative to the first aligned byte after the header
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = [array.dtype.str, list(array.shape), offset]
+        offset = _align(offset + array.nbytes)
+    encoded = json.dumps(header).encode("utf-8")
+    start = _align(8 + len(encoded))
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(encoded)) + encoded)
+        for name, array in arrays.items():
+            f.seek(start + header["arrays"][name][2])
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp, path)
+
+
+def check(disease, path, model=None):
+    """Compare the .forest file with the pickled model on the bundled dataset and stamp it when they match.
+
+    Returns (rows whose predicted class differs, rows checked).
+    """
+    if model is None:
+        model = registry.load_pickle(disease)
+    mismatches, rows = verify(disease, model, MappedForest(path))
+    if mismatches == 0:
+        stamp = {"forest_sha256": _sha256(path), "source_sha256": _sha256(registry.path(disease)), "rows": rows}
+        with open(_stamp_path(path), "w") as f:
+            json.dump(stamp, f, indent=2)
+    return mismatches, rows
+
+
+def convert(disease):
+    """Convert disease's pickle to a .forest file and verify it. Returns (path, mismatches, rows)."""
+    source = registry.path(disease)
+    with open(source, "rb") as f:
+        data = f.read()
+    model = pickle.loads(data)
+    path = forest_path(disease)
+    write(disease, model, path, hashlib.sha256(data).hexdigest())
+    mismatches, rows = check(disease, path, model)
+    if mismatches:
+        os.remove(path)
+    return path, mismatches, rows
+
+
+def load_verified(disease, source_sha256):
+    """disease's MappedForest if its .forest file was made from this pickle and verified, else None."""
+    path = forest_path(disease)
+    if not os.path.exists(path):
+        return None
+    # A truncated, corrupt or old-format file is skipped and the pickle used instead
+    try:
+        forest = MappedForest(path)
+        if forest.source_sha256 != source_sha256:
+            return None  # converted from an older pickle
+        try:
+            with open(_stamp_path(path)) as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            stamp = {}
+        if stamp.get("forest_sha256") != _sha256(path) or stamp.get("source_sha256") != source_sha256:
+            if check(disease, path)[0]:
+                return None
+    except (OSError, ValueError, KeyError, IndexError):
+        return None  # the mapping goes with the half-built MappedForest
+    return forest
+
+
+def convert_all():
+    """Convert every model in CONFIG, printing one line each. Returns True when all verified."""
+    ok = True
+    for disease in CONFIG:
+        path, mismatches, rows = convert(disease)
+        ok = ok and mismatches == 0
+        if mismatches:
+            print(f"{disease:<20} REJECTED: {mismatches}/{rows} rows differ from the pickle; kept the pickle")
+        else:
+            size = os.path.getsize(path)
+            print(f"{disease:<20} OK {os.path.relpath(path)}: {size / 1024:.0f} KB "
+                  f"(pickle {os.path.getsize(registry.path(disease)) / 1024:.0f} KB), {rows}/{rows} rows identical")
+    return ok
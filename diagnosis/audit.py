@@ -0,0 +1,182 @@
+"""Append-only audit log of every prediction served.
+
+Callers only append a record to an in-memory queue; a background thread writes
+the queue out in batches (every FLUSH_ROWS records or FLUSH_INTERVAL seconds,
+whichever comes first) and close() - registered with atexit - writes whatever is
+left on a clean shutdown.
+
+Files live in AUDIT_DIR, one writer per process, and rotate at ROTATE_BYTES.
+Each file is a sequence of blocks: MAGIC, a little-endian uint32 header length, a
+JSON header giving the row count and each column's dtype, shape, offset and size,
+then the raw column bytes. read() uses the headers to pull only the requested
+columns off disk.
+"""
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from diagnosis.registry import registry, resolve_path
+
+# Where audit files are written, relative to the project root
+AUDIT_DIR = "audit"
+
+# A batch is written once this many records are queued, or this many seconds after the first one
+FLUSH_ROWS = 512
+FLUSH_INTERVAL = 1.0
+
+# Start a new file once the current one reaches this size
+ROTATE_BYTES = 64 * 1024 * 1024
+
+MAGIC = b"DXA1"
+COLUMNS = ("timestamp", "disease", "source", "prediction", "result", "model_hash", "inputs")
+
+
+def _strings(values):
+    return np.array([value.encode("utf-8") for value in values], dtype=bytes)
+
+
+class AuditLog:
+    def __init__(self, directory=AUDIT_DIR, flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL, rotate_bytes=ROTATE_BYTES):
+        self.directory = resolve_path(directory)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self._pending = []
+        self._lock = threading.Lock()  # guards _pending
+        self._write_lock = threading.Lock()  # one batch written at a time
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = None
+        self._path = None
+
+    def record(self, disease, values, prediction, result, source):
+        """Queue one prediction. Only appends to a list; the file write happens on the writer thread."""
+        self._queue([(time.time(), disease, source, int(prediction), result, registry.file_hashes.get(disease, ""), values)])
+
+    def record_batch(self, disease, rows, predictions, results, source):
+        """Queue a batch of predictions made together, e.g. one API micro-batch."""
+        now = time.time()
+        model_hash = registry.file_hashes.get(disease, "")
+        self._queue([(now, disease, source, int(p), result, model_hash, values) for values, p, result in zip(rows, predictions, results)])
+
+    def _queue(self, entries):
+        with self._lock:
+            self._pending.extend(entries)
+            queued = len(self._pending)
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+        if queued >= self.flush_rows:
+            self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write every queued record now."""
+        with self._write_lock:
+            with self._lock:
+                entries, self._pending = self._pending, []
+            if entries:
+                self._write(entries)
+
+    def close(self):
+        """Stop the writer thread and write what is still queued."""
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+    def _file(self):
+        if self._path is None or not os.path.exists(self._path) or os.path.getsize(self._path) >= self.rotate_bytes:
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            self._path = os.path.join(self.directory, f"predictions-{stamp}-{os.getpid()}-{time.monotonic_ns()}.dxa")
+        return self._path
+
+    def _write(self, entries):
+        timestamps, diseases, sources, predictions, results, hashes, inputs = zip(*entries)
+        width = max(len(values) for values in inputs)
+        matrix = np.full((len(entries), width), np.nan)
+        for i, values in enumerate(inputs):
+            matrix[i, :len(values)] = values
+        columns = {
+            "timestamp": np.array(timestamps, dtype=np.float64),
+            "disease": _strings(diseases),
+            "source": _strings(sources),
+            "prediction": np.array(predictions, dtype=np.int64),
+            "result": _strings(results),
+            "model_hash": _strings(hashes),
+            "inputs": matrix,  # CONFIG feature order, NaN-padded to the widest disease in the block
+        }
+        layout = {}
+        offset = 0
+        for name, array in columns.items():
+            layout[name] = [array.dtype.str, list(array.shape), offset, array.nbytes]
+            offset += array.nbytes
+        header = json.dumps({"rows": len(entries), "columns": layout}).encode("utf-8")
+        with open(self._file(), "ab") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            for array in columns.values():
+                f.write(np.ascontiguousarray(array).tobytes())
+
+
+def _blocks(path):
+    """Yield (header, data offset) for every complete block in one audit file."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        position = 0
+        while position + 8 <= size:
+            f.seek(position)
+            magic, length = f.read(4), struct.unpack("<I", f.read(4))[0]
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not an audit file (bad block at byte {position})")
+            header = json.loads(f.read(length))
+            start = position + 8 + length
+            end = start + sum(nbytes for _, _, _, nbytes in header["columns"].values())
+            if end > size:
+                break  # a block cut short by a crash; everything before it is intact
+            yield header, start
+            position = end
+
+
+def read(columns=COLUMNS, disease=None, directory=AUDIT_DIR):
+    """Read audit records back as {column: array}, touching only the requested columns.
+
+    Strings come back as str arrays and inputs as a 2-D array padded with NaN.
+    disease keeps only that disease's records (its column is read for the filter).
+    """
+    directory = resolve_path(directory)
+    wanted = list(columns) + (["disease"] if disease is not None and "disease" not in columns else [])
+    parts = {name: [] for name in wanted}
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".dxa")) if os.path.isdir(directory) else []
+    for path in paths:
+        with open(path, "rb") as f:
+            for header, start in _blocks(path):
+                for name in wanted:
+                    dtype, shape, offset, nbytes = header["columns"][name]
+                    f.seek(start + offset)
+                    array = np.frombuffer(f.read(nbytes), dtype=dtype).reshape(shape)
+                    parts[name].append(np.char.decode(array, "utf-8") if array.dtype.kind == "S" else array)
+    result = {}
+    for name, arrays in parts.items():
+        if name == "inputs" and arrays:
+            width = max(array.shape[1] for array in arrays)
+            arrays = [np.pad(array, ((0, 0), (0, width - array.shape[1])), constant_values=np.nan) for array in arrays]
+        result[name] = np.concatenate(arrays) if arrays else np.empty(0)
+    if disease is not None:
+        keep = result["disease"] == disease
+        result = {name: array[keep] for name, array in result.items() if name in columns}
+    return result
+
+
+# Shared by the app, the API and screening in this process
+audit_log = AuditLog()
+atexit.register(audit_log.close)
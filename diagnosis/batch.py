@@ -0,0 +1,170 @@
+import collections
+import io
+import itertools
+import multiprocessing
+import os
+import sys
+
+import pandas as pd
+
+from diagnosis.config import CONFIG
+from diagnosis.inference import encode_categories, predict
+from diagnosis.registry import registry, resolve_path
+from diagnosis.schema import SCHEMAS
+
+# Rows parsed, predicted and written per step; memory use is bounded by this, not the file size
+CHUNK_SIZE = 10000
+
+
+def _normalize(name):
+    return " ".join(str(name).split()).lower()
+
+
+def resolve_columns(disease, columns):
+    """Map each CONFIG feature to a column by exact name, loose name or form label.
+
+    Returns (mapping, missing) where missing lists the features with no column.
+    """
+    by_name = {_normalize(column): column for column in columns}
+    mapping = {}
+    missing = []
+    for feature, input_config in zip(CONFIG[disease]["features"], CONFIG[disease]["inputs"]):
+        if feature in columns:
+            mapping[feature] = feature
+        elif _normalize(feature) in by_name:
+            mapping[feature] = by_name[_normalize(feature)]
+        elif _normalize(input_config["label"]) in by_name:
+            mapping[feature] = by_name[_normalize(input_config["label"])]
+        else:
+            missing.append(feature)
+    return mapping, missing
+
+
+def match_columns(disease, columns):
+    """Like resolve_columns, but every feature must be present."""
+    mapping, missing = resolve_columns(disease, columns)
+    if missing:
+        raise ValueError(f"Input has no column for {disease} feature(s): {', '.join(map(repr, missing))}")
+    return mapping
+
+
+def feature_frame(disease, chunk, mapping):
+    """Select and rename mapped columns into CONFIG feature order, coercing them to numbers."""
+    features = CONFIG[disease]["features"]
+    frame = chunk[[mapping[feature] for feature in features]].set_axis(features, axis=1)
+    frame = encode_categories(disease, frame)
+    return frame.apply(pd.to_numeric, errors="coerce")
+
+
+# How score_csv evaluates the model: sklearn's own predict, or the NumPy CompiledForest
+ENGINES = ("sklearn", "numpy")
+
+
+def models_for(disease, engine):
+    """(model, compiled) to predict with on engine. The numpy engine's CompiledForest serves as
+    both, so a verified .forest file is used without unpickling the sklearn model."""
+    if engine == "numpy":
+        compiled = registry.compiled(disease)
+        return compiled, compiled
+    return registry.get(disease), None
+
+
+def load_dataset(disease):
+    """The disease's bundled dataset (CONFIG "dataset") as a frame of CONFIG features."""
+    raw = pd.read_csv(resolve_path(CONFIG[disease]["dataset"]))
+    return feature_frame(disease, raw, match_columns(disease, raw.columns))
+
+
+def _score_block(disease, header, lines, mapping, engine, validate):
+    """Parse, predict and format one block of CSV lines; returns (csv text, rows, rows failing validation).
+
+    Runs in a pool worker, so all of a chunk's work is spread over the cores; forked
+    workers find the model already in the inherited registry.
+    """
+    chunk = pd.read_csv(io.StringIO(header + lines))
+    if chunk.empty:
+        return "", 0, 0
+    frame = feature_frame(disease, chunk, mapping)
+    model, compiled = models_for(disease, engine)
+    chunk.insert(len(chunk.columns), "prediction", predict(disease, model, frame, compiled))
+    invalid = 0
+    if validate:
+        _, errors = SCHEMAS[disease].check(frame.to_numpy(dtype=float))
+        chunk.insert(len(chunk.columns), "errors", ["; ".join(errors.get(i, ())) for i in range(len(chunk))])
+        invalid = len(errors)
+    return chunk.to_csv(header=False, index=False), len(chunk), invalid
+
+
+def _line_blocks(f, chunk_size):
+    """Yield blocks of chunk_size CSV records from f as raw text.
+
+    Splitting text is far cheaper than parsing it, so the parent process only does
+    this. A block is extended while it holds an odd number of quote characters, so a
+    quoted field spanning lines is never cut in two.
+    """
+    while True:
+        lines = list(itertools.islice(f, chunk_size))
+        if not lines:
+            return
+        quotes = sum(line.count('"') for line in lines)
+        while quotes % 2:
+            line = f.readline()
+            if not line:
+                break
+            lines.append(line)
+            quotes += line.count('"')
+        yield "".join(lines)
+
+
+def _pool(jobs):
+    # On Linux, fork shares the parent's loaded trees copy-on-write. sklearn copies tree arrays out
+    # of any memmap when unpickling, so this is what keeps per-worker memory small. Elsewhere the
+    # platform default is kept (macOS spawns because forking there can crash the child); spawned
+    # workers share memory through the memory-mapped .forest files instead.
+    return multiprocessing.get_context("fork" if sys.platform.startswith("linux") else None).Pool(jobs)
+
+
+def _scored_blocks(disease, header, blocks, mapping, jobs, engine, validate):
+    """Yield _score_block results in input order, scoring on up to jobs processes."""
+    if jobs == 1:
+        for lines in blocks:
+            yield _score_block(disease, header, lines, mapping, engine, validate)
+        return
+    with _pool(jobs) as pool:
+        # Bound the work in flight so memory stays flat however large the input is
+        pending = collections.deque()
+        for lines in blocks:
+            pending.append(pool.apply_async(_score_block, (disease, header, lines, mapping, engine, validate)))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def score_csv(disease, input_path, output_path, chunk_size=CHUNK_SIZE, jobs=1, engine="sklearn", validate=False):
+    """Stream input_path through the disease model, writing each row plus a prediction column.
+
+    With jobs > 1 (or 0 for every core) chunks are parsed, predicted and formatted in
+    parallel worker processes; the parent only splits the file into lines and writes.
+    engine is one of ENGINES. With validate, every row is checked against the disease's
+    Schema and an errors column lists what is out of range (rows are still scored).
+    Returns (rows scored, rows that failed validation).
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk size must be at least 1, got {chunk_size}")
+    jobs = jobs or os.cpu_count()
+    # Load (and compile) before the pool starts so forked workers inherit the model instead of unpickling it
+    models_for(disease, engine)
+    columns = pd.read_csv(input_path, nrows=0).columns
+    mapping = match_columns(disease, columns)
+    rows = invalid = 0
+    with open(input_path, newline="", encoding="utf-8-sig") as f, open(output_path, "w", newline="") as out:
+        header = f.readline()
+        # Workers return rows only; the header is written once here
+        pd.DataFrame(columns=[*columns, "prediction", *(["errors"] if validate else [])]).to_csv(out, index=False)
+        blocks = _line_blocks(f, chunk_size)
+        for text, scored, failed in _scored_blocks(disease, header, blocks, mapping, jobs, engine, validate):
+            out.write(text)
+            rows += scored
+            invalid += failed
+    return rows, invalid
@@ -0,0 +1,182 @@
+"""Reproducible per-disease benchmarks: model load time (pickle and, once
+convert-models has run, .forest), single-row latency, batch throughput and peak memory.
+
+Each disease is measured in its own fresh interpreter so load times and peak RSS
+are not skewed by the models benchmarked before it. Run with
+``python -m diagnosis bench``.
+"""
+import hashlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from diagnosis.config import CONFIG
+from diagnosis.registry import BASE_DIR
+
+BATCH_SIZES = (1, 16, 256, 4096)
+
+# Metrics compared against a baseline; True where a larger value is better
+METRICS = {
+    "load_ms": False,
+    "forest_load_ms": False,
+    "row_p50_ms": False,
+    "row_p99_ms": False,
+    "peak_rss_mb": False,
+    "throughput_rows_per_s": True,
+}
+
+# Run settings a baseline must share to be compared against
+SETTINGS = ("engine", "repeat")
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _measure(disease, engine, repeat):
+    import pickle
+
+    import numpy as np
+    import sklearn.ensemble  # noqa: F401  imported up front so it is not counted as load time
+
+    from diagnosis.artifact import forest_path, load_verified
+    from diagnosis.batch import load_dataset
+    from diagnosis.engine import CompiledForest
+    from diagnosis.inference import predict, predict_row
+    from diagnosis.registry import registry
+
+    with open(registry.path(disease), "rb") as f:
+        data = f.read()
+    load_times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        model = pickle.loads(data)
+        load_times.append(time.perf_counter() - start)
+    compiled = CompiledForest(model) if engine == "numpy" else None
+
+    # The registry's load path for the compiled engine: hash the pickle, check and map the .forest file
+    forest_times = []
+    if os.path.exists(forest_path(disease)):
+        for _ in range(5):
+            start = time.perf_counter()
+            forest = load_verified(disease, hashlib.sha256(data).hexdigest())
+            forest_times.append(time.perf_counter() - start)
+        if forest is None:
+            forest_times = []  # stale or damaged; the registry would unpickle instead
+
+    dataset = load_dataset(disease)
+    rows = dataset.to_numpy().tolist()
+    rng = np.random.default_rng(0)
+
+    row_times = []
+    for i in range(repeat + 10):
+        values = rows[i % len(rows)]
+        start = time.perf_counter()
+        predict_row(disease, model, values, compiled)
+        if i >= 10:  # the first calls warm caches and the feature layout
+            row_times.append(time.perf_counter() - start)
+
+    throughput = {}
+    for size in BATCH_SIZES:
+        batch = dataset.iloc[rng.integers(0, len(dataset), size)].reset_index(drop=True)
+        predict(disease, model, batch, compiled)
+        calls = max(3, min(50, 20000 // size))
+        start = time.perf_counter()
+        for _ in range(calls):
+            predict(disease, model, batch, compiled)
+        throughput[str(size)] = size * calls / (time.perf_counter() - start)
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {
+        "load_ms": sorted(load_times)[len(load_times) // 2] * 1000,
+        "forest_load_ms": sorted(forest_times)[len(forest_times) // 2] * 1000 if forest_times else None,
+        "row_p50_ms": _percentile(row_times, 50) * 1000,
+        "row_p99_ms": _percentile(row_times, 99) * 1000,
+        "throughput_rows_per_s": throughput,
+        "peak_rss_mb": peak_mb,
+    }
+
+
+def run(diseases=None, engine="sklearn", repeat=200):
+    """Benchmark each disease in a fresh interpreter; returns the JSON-ready results."""
+    import numpy
+    import sklearn
+
+    results = {}
+    for disease in diseases or CONFIG:
+        output = subprocess.run(
+            [sys.executable, "-W", "ignore", "-m", "diagnosis.bench", disease, engine, str(repeat)],
+            capture_output=True, text=True, check=True, cwd=BASE_DIR
+        ).stdout
+        results[disease] = json.loads(output.splitlines()[-1])
+    return {
+        "meta": {
+            "engine": engine,
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "sklearn": sklearn.__version__,
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def environment_changes(current, baseline):
+    """Run metadata (library versions, machine, ...) that differs from the baseline's, as readable lines."""
+    old, new = baseline.get("meta", {}), current["meta"]
+    return [f"{key}: {old.get(key)} -> {new.get(key)}" for key in new if key not in SETTINGS and old.get(key) != new.get(key)]
+
+
+def compare(current, baseline, threshold):
+    """List regressions of more than threshold (a fraction, e.g. 0.2 for 20%) against baseline.
+
+    Raises ValueError when the two runs used different SETTINGS, since their numbers
+    measure different things.
+    """
+    old_meta = baseline.get("meta", {})
+    for key in SETTINGS:
+        if old_meta.get(key) != current["meta"][key]:
+            raise ValueError(
+                f"baseline was run with {key}={old_meta.get(key)!r} and this run with {key}={current['meta'][key]!r}; "
+                f"rerun with the same {key} to compare"
+            )
+    regressions = []
+    for disease, metrics in current["results"].items():
+        old = baseline["results"].get(disease)
+        if old is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            pairs = [(metric, metrics[metric], old.get(metric))]
+            if isinstance(metrics[metric], dict):
+                pairs = [(f"{metric}[{key}]", value, (old.get(metric) or {}).get(key)) for key, value in metrics[metric].items()]
+            for name, new_value, old_value in pairs:
+                if not old_value or new_value is None:
+                    continue
+                change = (new_value - old_value) / old_value
+                if (-change if higher_is_better else change) > threshold:
+                    regressions.append(f"{disease} {name}: {old_value:.4g} -> {new_value:.4g} ({change:+.0%})")
+    return regressions
+
+
+def report(results):
+    sizes = "  ".join(f"{'x' + str(size) + ' rows/s':>14}" for size in BATCH_SIZES)
+    print(f"{'disease':<20} {'load ms':>8} {'forest':>8} {'p50 ms':>8} {'p99 ms':>8} {'RSS MB':>8}  {sizes}")
+    for disease, metrics in results["results"].items():
+        throughput = "  ".join(f"{metrics['throughput_rows_per_s'][str(size)]:>14.0f}" for size in BATCH_SIZES)
+        forest = "-" if metrics.get("forest_load_ms") is None else f"{metrics['forest_load_ms']:.1f}"
+        print(
+            f"{disease:<20} {metrics['load_ms']:>8.1f} {forest:>8} {metrics['row_p50_ms']:>8.2f} "
+            f"{metrics['row_p99_ms']:>8.2f} {metrics['peak_rss_mb']:>8.0f}  {throughput}"
+        )
+
+
+if __name__ == "__main__":
+    print(json.dumps(_measure(sys.argv[1], sys.argv[2], int(sys.argv[3]))))
@@ -0,0 +1,78 @@
+import collections
+import threading
+import time
+
+from diagnosis.metrics import metrics
+from diagnosis.registry import registry
+
+# Defaults for the shared prediction cache: entries kept per disease, and seconds each stays valid
+CACHE_SIZE = 256
+CACHE_TTL = 3600
+
+
+class PredictionCache:
+    """Bounded per-disease LRU cache of predictions keyed on the submitted feature values.
+
+    Values are normalized to floats so 5 and 5.0 share an entry. Entries expire after
+    ttl seconds (None keeps them until evicted).
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = collections.defaultdict(collections.OrderedDict)
+        self._hits = collections.Counter()
+        self._misses = collections.Counter()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(values):
+        return tuple(float(value) for value in values)
+
+    def get(self, disease, values):
+        """Return the cached prediction for values, or None."""
+        key = self.key(values)
+        prediction = None
+        with self._lock:
+            entries = self._entries[disease]
+            entry = entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.monotonic()):
+                entries.move_to_end(key)
+                self._hits[disease] += 1
+                prediction = entry[0]
+            else:
+                if entry is not None:
+                    del entries[key]
+                self._misses[disease] += 1
+        metrics.inc("diagnosis_prediction_cache_total", disease=disease, outcome="miss" if prediction is None else "hit")
+        return prediction
+
+    def put(self, disease, values, prediction):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            entries = self._entries[disease]
+            entries[self.key(values)] = (prediction, expires)
+            entries.move_to_end(self.key(values))
+            while len(entries) > self.maxsize:
+                entries.popitem(last=False)
+
+    def clear(self, disease=None):
+        with self._lock:
+            if disease is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(disease, None)
+
+    def stats(self):
+        """Hit/miss counts and current size for every disease seen so far."""
+        with self._lock:
+            diseases = set(self._entries) | set(self._hits) | set(self._misses)
+            return {
+                disease: {"hits": self._hits[disease], "misses": self._misses[disease], "size": len(self._entries.get(disease, ()))}
+                for disease in sorted(diseases)
+            }
+
+
+# Shared by every session; a disease's entries are dropped whenever its model file is (re)loaded
+prediction_cache = PredictionCache()
+registry.listeners.append(prediction_cache.clear)
@@ -0,0 +1,208 @@
+# Configuration for diseases, models, features, descriptions, and inputs
+CONFIG = {
+    "Diabetes": {
+        "model": "models/diabetes_model.sav",
+        "dataset": "datasets/diabetes_data.csv",
+        "target": "Outcome",
+        "features": ['Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness', 'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'],
+        "description": "Assesses diabetes risk using metrics like glucose levels, BMI, and number of pregnancies.",
+        "inputs": [
+            {"label": "Number of Pregnancies", "type": "number", "min_value": 0, "step": 1, "example": "3"},
+            {"label": "Glucose Level", "type": "number", "min_value": 0, "step": 1, "example": "120"},
+            {"label": "Blood Pressure value", "type": "number", "min_value": 0, "step": 1, "example": "80"},
+            {"label": "Skin Thickness value", "type": "number", "min_value": 0, "step": 1, "example": "20"},
+            {"label": "Insulin Level", "type": "number", "min_value": 0, "step": 1, "example": "80"},
+            {"label": "BMI value", "type": "number", "min_value": 0.0, "step": 0.1, "example": "32.0"},
+            {"label": "Diabetes Pedigree Function value", "type": "number", "min_value": 0.0, "step": 0.01, "example": "0.5"},
+            {"label": "Age of the Person", "type": "number", "min_value": 0, "step": 1, "example": "45"}
+        ]
+    },
+    "Heart Disease": {
+        "model": "models/heart_disease_model.sav",
+        "dataset": "datasets/heart_disease_data.csv",
+        "target": "target",
+        "features": ['age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak', 'slope', 'ca', 'thal'],
+        "description": "Predicts the likelihood of heart disease based on factors like age, cholesterol, and chest pain type.",
+        "inputs": [
+            {"label": "Age", "type": "number", "min_value": 0, "step": 1, "example": "55"},
+            {"label": "Sex (1 = Male, 0 = Female)", "type": "selectbox", "options": [1, 0], "example": "1"},
+            {"label": "Chest Pain types (0-3)", "type": "number", "min_value": 0, "max_value": 3, "step": 1, "example": "2"},
+            {"label": "Resting Blood Pressure", "type": "number", "min_value": 0, "step": 1, "example": "130"},
+            {"label": "Serum Cholesterol in mg/dl", "type": "number", "min_value": 0, "step": 1, "example": "240"},
+            {"label": "Fasting Blood Sugar > 120 mg/dl (1 = True, 0 = False)", "type": "selectbox", "options": [1, 0], "example": "0"},
+            {"label": "Resting Electrocardiographic results (0-2)", "type": "number", "min_value": 0, "max_value": 2, "step": 1, "example": "1"},
+            {"label": "Maximum Heart Rate achieved", "type": "number", "min_value": 0, "step": 1, "example": "150"},
+            {"label": "Exercise Induced Angina (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "0"},
+            {"label": "ST depression induced by exercise", "type": "number", "min_value": 0.0, "step": 0.1, "example": "1.0"},
+            {"label": "Slope of the peak exercise ST segment (0-2)", "type": "number", "min_value": 0, "max_value": 2, "step": 1, "example": "1"},
+            {"label": "Major vessels colored by fluoroscopy (0-3)", "type": "number", "min_value": 0, "max_value": 3, "step": 1, "example": "0"},
+            {"label": "Thal (0 = Normal, 1 = Fixed Defect, 2 = Reversible Defect)", "type": "number", "min_value": 0, "max_value": 2, "step": 1, "example": "2"}
+        ]
+    },
+    "Parkinsons Disease": {
+        "model": "models/parkinsons_model.sav",
+        "dataset": "datasets/parkinsons_data.csv",
+        "target": "status",
+        "features": ['MDVP:Fo', 'MDVP:Fhi', 'MDVP:Flo', 'MDVP:Jitter', 'MDVP:Jitter.1', 'MDVP:RAP', 'MDVP:PPQ', 'Jitter:DDP', 'MDVP:Shimmer', 'MDVP:Shimmer.1', 'Shimmer:APQ3', 'Shimmer:APQ5', 'MDVP:APQ', 'Shimmer:DDA', 'NHR', 'HNR', 'RPDE', 'DFA', 'spread1', 'spread2', 'D2', 'PPE'],
+        "description": "Identifies Parkinson’s disease using voice measurements like jitter and shimmer.",
+        "inputs": [
+            {"label": "MDVP:Fo", "type": "number", "min_value": 0.0, "step": 0.1, "example": "119.992"},
+            {"label": "MDVP:Fhi", "type": "number", "min_value": 0.0, "step": 0.1, "example": "157.302"},
+            {"label": "MDVP:Flo", "type": "number", "min_value": 0.0, "step": 0.1, "example": "74.997"},
+            {"label": "MDVP:Jitter", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.00784"},
+            {"label": "MDVP:Jitter(Abs)", "type": "number", "min_value": 0.0, "step": 0.00001, "example": "0.00007"},
+            {"label": "MDVP:RAP", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.00370"},
+            {"label": "MDVP:PPQ", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.00554"},
+            {"label": "Jitter:DDP", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.01109"},
+            {"label": "MDVP:Shimmer", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.04374"},
+            {"label": "MDVP:Shimmer(dB)", "type": "number", "min_value": 0.0, "step": 0.01, "example": "0.426"},
+            {"label": "Shimmer:APQ3", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.02182"},
+            {"label": "Shimmer:APQ5", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.03130"},
+            {"label": "MDVP:APQ", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.02971"},
+            {"label": "Shimmer:DDA", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.06545"},
+            {"label": "NHR", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.02211"},
+            {"label": "HNR", "type": "number", "min_value": 0.0, "step": 0.01, "example": "21.033"},
+            {"label": "RPDE", "type": "number", "min_value": 0.0, "step": 0.01, "example": "0.414783"},
+            {"label": "DFA", "type": "number", "min_value": 0.0, "step": 0.01, "example": "0.815285"},
+            {"label": "spread1", "type": "number", "min_value": -10.0, "step": 0.01, "example": "-4.813031"},
+            {"label": "spread2", "type": "number", "min_value": 0.0, "step": 0.01, "example": "0.266482"},
+            {"label": "D2", "type": "number", "min_value": 0.0, "step": 0.01, "example": "2.301442"},
+            {"label": "PPE", "type": "number", "min_value": 0.0, "step": 0.01, "example": "0.284654"}
+        ]
+    },
+    "Lung Cancer": {
+        "model": "models/lung_cancer_model.sav",
+        "dataset": "datasets/lung_cancer_data.csv",
+        "target": "LUNG_CANCER",
+        "target_labels": {"YES": 1, "NO": 0},
+        "features": ['GENDER', 'AGE', 'SMOKING', 'YELLOW_FINGERS', 'ANXIETY', 'PEER_PRESSURE', 'CHRONIC DISEASE', 'FATIGUE ', 'ALLERGY ', 'WHEEZING', 'ALCOHOL CONSUMING', 'COUGHING', 'SHORTNESS OF BREATH', 'SWALLOWING DIFFICULTY', 'CHEST PAIN'],
+        "categories": {"GENDER": {"M": 1, "F": 0}},  # raw dataset codes, one-hot encoded by the model
+        "description": "Evaluates lung cancer risk based on symptoms like smoking, coughing, and chest pain.",
+        "inputs": [
+            {"label": "Gender (1 = Male, 0 = Female)", "type": "selectbox", "options": [1, 0], "example": "1"},
+            {"label": "Age", "type": "number", "min_value": 0, "step": 1, "example": "62"},
+            {"label": "Smoking (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "1"},
+            {"label": "Yellow Fingers (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "0"},
+            {"label": "Anxiety (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "0"},
+            {"label": "Peer Pressure (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "0"},
+            {"label": "Chronic Disease (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "0"},
+            {"label": "Fatigue (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "1"},
+            {"label": "Allergy (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "0"},
+            {"label": "Wheezing (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "1"},
+            {"label": "Alcohol Consuming (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "0"},
+            {"label": "Coughing (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "1"},
+            {"label": "Shortness of Breath (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "1"},
+            {"label": "Swallowing Difficulty (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "0"},
+            {"label": "Chest Pain (1 = Yes, 0 = No)", "type": "selectbox", "options": [1, 0], "example": "1"}
+        ]
+    },
+    "Breast Cancer": {
+        "model": "models/breast_cancer_model.sav",
+        "dataset": "datasets/breast_cancer_data.csv",
+        "target": "target",
+        "features": [
+            'mean radius', 'mean texture', 'mean perimeter', 'mean area', 'mean smoothness',
+            'mean compactness', 'mean concavity', 'mean concave points', 'mean symmetry', 'mean fractal dimension',
+            'radius error', 'texture error', 'perimeter error', 'area error', 'smoothness error',
+            'compactness error', 'concavity error', 'concave points error', 'symmetry error', 'fractal dimension error',
+            'worst radius', 'worst texture', 'worst perimeter', 'worst area', 'worst smoothness',
+            'worst compactness', 'worst concavity', 'worst concave points', 'worst symmetry', 'worst fractal dimension'
+        ],
+        "description": "Detects breast cancer using tumor characteristics like radius, texture, and smoothness.",
+        "inputs": [
+            {"label": "Mean Radius", "type": "number", "min_value": 0.0, "step": 0.1, "example": "15.0"},
+            {"label": "Mean Texture", "type": "number", "min_value": 0.0, "step": 0.1, "example": "20.0"},
+            {"label": "Mean Perimeter", "type": "number", "min_value": 0.0, "step": 0.1, "example": "90.0"},
+            {"label": "Mean Area", "type": "number", "min_value": 0.0, "step": 1.0, "example": "600.0"},
+            {"label": "Mean Smoothness", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.1"},
+            {"label": "Mean Compactness", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.1"},
+            {"label": "Mean Concavity", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.1"},
+            {"label": "Mean Concave Points", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.05"},
+            {"label": "Mean Symmetry", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.18"},
+            {"label": "Mean Fractal Dimension", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.06"},
+            {"label": "Radius Error", "type": "number", "min_value": 0.0, "step": 0.01, "example": "0.4"},
+            {"label": "Texture Error", "type": "number", "min_value": 0.0, "step": 0.01, "example": "1.2"},
+            {"label": "Perimeter Error", "type": "number", "min_value": 0.0, "step": 0.01, "example": "2.8"},
+            {"label": "Area Error", "type": "number", "min_value": 0.0, "step": 0.1, "example": "40.0"},
+            {"label": "Smoothness Error", "type": "number", "min_value": 0.0, "step": 0.0001, "example": "0.007"},
+            {"label": "Compactness Error", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.02"},
+            {"label": "Concavity Error", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.03"},
+            {"label": "Concave Points Error", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.01"},
+            {"label": "Symmetry Error", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.02"},
+            {"label": "Fractal Dimension Error", "type": "number", "min_value": 0.0, "step": 0.0001, "example": "0.003"},
+            {"label": "Worst Radius", "type": "number", "min_value": 0.0, "step": 0.1, "example": "17.0"},
+            {"label": "Worst Texture", "type": "number", "min_value": 0.0, "step": 0.1, "example": "25.0"},
+            {"label": "Worst Perimeter", "type": "number", "min_value": 0.0, "step": 0.1, "example": "110.0"},
+            {"label": "Worst Area", "type": "number", "min_value": 0.0, "step": 1.0, "example": "800.0"},
+            {"label": "Worst Smoothness", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.12"},
+            {"label": "Worst Compactness", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.25"},
+            {"label": "Worst Concavity", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.3"},
+            {"label": "Worst Concave Points", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.15"},
+            {"label": "Worst Symmetry", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.3"},
+            {"label": "Worst Fractal Dimension", "type": "number", "min_value": 0.0, "step": 0.001, "example": "0.08"}
+        ]
+    },
+    "Brain Disease": {
+        "model": "models/alzheimers_model.sav",
+        "dataset": "datasets/alzheimers_data.csv",
+        "target": "CDR",
+        "target_labels": {0: 0, 0.5: 1, 1: 1, 2: 1},  # any Clinical Dementia Rating above 0; rows without one are skipped
+        "features": ['Age', 'Educ', 'SES', 'MMSE', 'eTIV', 'nWBV', 'ASF'],
+        "description": "Predicts brain disease risk using brain metrics like MMSE score and brain volume.",
+        "inputs": [
+            {"label": "Age", "type": "number", "min_value": 0, "step": 1, "example": "85"},
+            {"label": "Years of Education", "type": "number", "min_value": 0, "step": 1, "example": "12"},
+            {"label": "Socioeconomic Status (SES, 1-5)", "type": "number", "min_value": 1, "max_value": 5, "step": 1, "example": "3", "default_value": 1},
+            {"label": "MMSE Score (0-30)", "type": "number", "min_value": 0, "max_value": 30, "step": 1, "example": "18"},
+            {"label": "eTIV", "type": "number", "min_value": 0.0, "step": 1.0, "example": "1500.0"},
+            {"label": "nWBV", "type": "number", "min_value": 0.0, "step": 0.01, "example": "0.65"},
+            {"label": "ASF", "type": "number", "min_value": 0.0, "step": 0.01, "example": "1.2"}
+        ]
+    },
+    "Kidney Disease": {
+        "model": "models/kidney_model.sav",
+        "dataset": "datasets/kidney_data.csv",
+        "target": "class",
+        "target_labels": {"ckd": 1, "notckd": 0},
+        "features": ['age', 'bp', 'sg', 'al', 'su', 'bgr', 'bu', 'sc', 'sod', 'pot', 'hemo', 'pcv', 'wbcc', 'rbcc'],
+        "description": "Detects chronic kidney disease using blood metrics like serum creatinine and hemoglobin.",
+        "inputs": [
+            {"label": "Age", "type": "number", "min_value": 0, "step": 1, "example": "60"},
+            {"label": "Blood Pressure (mmHg)", "type": "number", "min_value": 0, "step": 1, "example": "90"},
+            {"label": "Specific Gravity (sg)", "type": "number", "min_value": 1.0, "step": 0.005, "example": "1.020", "default_value": 1.0},
+            {"label": "Albumin (al, 0-5)", "type": "number", "min_value": 0, "step": 1, "example": "1"},
+            {"label": "Sugar (su, 0-5)", "type": "number", "min_value": 0, "step": 1, "example": "0"},
+            {"label": "Blood Glucose Random (bgr, mg/dL)", "type": "number", "min_value": 0, "step": 1, "example": "150"},
+            {"label": "Blood Urea (bu, mg/dL)", "type": "number", "min_value": 0.0, "step": 0.1, "example": "50.0"},
+            {"label": "Serum Creatinine (sc, mg/dL)", "type": "number", "min_value": 0.0, "step": 0.1, "example": "3.0"},
+            {"label": "Sodium (sod, mEq/L)", "type": "number", "min_value": 0.0, "step": 0.1, "example": "135.0"},
+            {"label": "Potassium (pot, mEq/L)", "type": "number", "min_value": 0.0, "step": 0.1, "example": "4.0"},
+            {"label": "Hemoglobin (hemo, g/dL)", "type": "number", "min_value": 0.0, "step": 0.1, "example": "10.0"},
+            {"label": "Packed Cell Volume (pcv)", "type": "number", "min_value": 0.0, "step": 0.1, "example": "40.0"},
+            {"label": "White Blood Cell Count (wbcc, cells/cumm)", "type": "number", "min_value": 0, "step": 100, "example": "8000"},
+            {"label": "Red Blood Cell Count (rbcc, millions/cumm)", "type": "number", "min_value": 0.0, "step": 0.1, "example": "4.5"}
+        ]
+    }
+}
+
+# Patient details that mean the same thing for several diseases, keyed by the name used in a
+# unified screening record. Blood pressure is shared only where the model expects diastolic
+# pressure; Heart Disease's resting (systolic) pressure stays disease-specific.
+SHARED_FIELDS = {
+    "age": {
+        "label": "Age",
+        "features": {"Diabetes": "Age", "Heart Disease": "age", "Lung Cancer": "AGE", "Brain Disease": "Age", "Kidney Disease": "age"}
+    },
+    "sex": {
+        "label": "Sex (1 = Male, 0 = Female)",
+        "features": {"Heart Disease": "sex", "Lung Cancer": "GENDER"}
+    },
+    "glucose": {
+        "label": "Blood Glucose (mg/dL)",
+        "features": {"Diabetes": "Glucose", "Kidney Disease": "bgr"}
+    },
+    "blood_pressure": {
+        "label": "Diastolic Blood Pressure (mmHg)",
+        "features": {"Diabetes": "BloodPressure", "Kidney Disease": "bp"}
+    }
+}
@@ -0,0 +1,147 @@
+"""Cleaned, typed copies of the bundled datasets, cached as memory-mappable NumPy files.
+
+build() parses a disease's CSV once: columns are matched and coerced to numbers as
+for batch scoring, and the target column is mapped with CONFIG "target_labels".
+The result is written as X.npy (CONFIG features, column-major float64) and y.npy
+(int8 labels) under CACHE_DIR, in a directory named after the CSV's SHA-256, so
+an edited CSV is rebuilt automatically. load() memory-maps the cached arrays.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from diagnosis.batch import _normalize, feature_frame, match_columns, models_for
+from diagnosis.config import CONFIG
+from diagnosis.inference import model_matrix
+from diagnosis.registry import resolve_path
+
+# Where the cleaned copies are kept, relative to the project root
+CACHE_DIR = ".cache/datasets"
+
+# Part of every cache key; bump it when the cleaning below changes so old copies are ignored
+PIPELINE_VERSION = 1
+
+# Rows predicted per call when evaluating
+EVAL_BATCH_SIZE = 4096
+
+
+def _cache_dir(disease):
+    path = resolve_path(CONFIG[disease]["dataset"])
+    digest = hashlib.sha256(f"v{PIPELINE_VERSION}:".encode())
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(resolve_path(CACHE_DIR), f"{name}-{digest.hexdigest()[:16]}")
+
+
+def targets(disease, raw):
+    """The disease's CONFIG "target" column as floats: 1, 0, or NaN where there is no usable label."""
+    column = CONFIG[disease]["target"]
+    by_name = {_normalize(name): name for name in raw.columns}
+    if _normalize(column) not in by_name:
+        raise ValueError(f"{CONFIG[disease]['dataset']} has no {column!r} column")
+    values = raw[by_name[_normalize(column)]]
+    labels = CONFIG[disease].get("target_labels")
+    if labels is None:
+        return pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    if values.dtype == object:
+        values = values.str.strip()  # e.g. "ckd\t" in the kidney data
+    else:
+        values = pd.to_numeric(values, errors="coerce")
+    return values.map(labels).to_numpy(dtype=float)
+
+
+def build(disease):
+    """Parse the disease's CSV and write its cleaned arrays to the cache. Returns the cache directory."""
+    directory = _cache_dir(disease)
+    raw = pd.read_csv(resolve_path(CONFIG[disease]["dataset"]))
+    X = feature_frame(disease, raw, match_columns(disease, raw.columns)).to_numpy(dtype=np.float64)
+    y = targets(disease, raw)
+    keep = ~np.isnan(y)
+    meta = {
+        "disease": disease,
+        "source": CONFIG[disease]["dataset"],
+        "features": CONFIG[disease]["features"],
+        "rows": int(keep.sum()),
+        "skipped": int((~keep).sum()),  # rows without a usable target label
+    }
+    # Written to a scratch directory and renamed into place, so readers never see half a cache
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    scratch = tempfile.mkdtemp(dir=os.path.dirname(directory))
+    np.save(os.path.join(scratch, "X.npy"), np.asfortranarray(X[keep]))
+    np.save(os.path.join(scratch, "y.npy"), y[keep].astype(np.int8))
+    with open(os.path.join(scratch, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    try:
+        os.rename(scratch, directory)
+    except OSError:
+        shutil.rmtree(scratch)  # another process built the same cache first
+    return directory
+
+
+def is_cached(disease):
+    return os.path.isdir(_cache_dir(disease))
+
+
+def clear(disease):
+    """Drop the disease's cached copy so the next load re-parses the CSV."""
+    shutil.rmtree(_cache_dir(disease), ignore_errors=True)
+
+
+def load(disease):
+    """(X, y) for the disease's dataset, memory-mapped from the cache (built first if needed)."""
+    directory = _cache_dir(disease)
+    if not os.path.isdir(directory):
+        build(disease)
+    return (
+        np.load(os.path.join(directory, "X.npy"), mmap_mode="r"),
+        np.load(os.path.join(directory, "y.npy"), mmap_mode="r"),
+    )
+
+
+def _predict(disease, model, X, compiled):
+    M = model_matrix(disease, model, X)
+    if compiled is not None:
+        return compiled.predict(M)
+    if hasattr(model, "feature_names_in_"):
+        M = pd.DataFrame(M, columns=model.feature_names_in_)
+    return model.predict(M)
+
+
+def evaluate(disease, engine="sklearn", batch_size=EVAL_BATCH_SIZE):
+    """Score the disease's model against its cached dataset and time each step."""
+    cached = is_cached(disease)
+    start = time.perf_counter()
+    X, y = load(disease)
+    load_time = time.perf_counter() - start
+    model, compiled = models_for(disease, engine)
+    start = time.perf_counter()
+    predictions = np.concatenate([_predict(disease, model, X[i:i + batch_size], compiled) for i in range(0, len(X), batch_size)])
+    predict_time = time.perf_counter() - start
+    return {
+        "rows": len(X),
+        "accuracy": float((predictions == y).mean()),
+        "cached": cached,
+        "load_ms": load_time * 1000,
+        "predict_ms": predict_time * 1000,
+        "rows_per_s": len(X) / predict_time,
+    }
+
+
+def run(diseases=None, engine="sklearn", batch_size=EVAL_BATCH_SIZE):
+    return {disease: evaluate(disease, engine, batch_size) for disease in diseases or CONFIG}
+
+
+def report(results):
+    for disease, result in results.items():
+        print(
+            f"{disease:<20} accuracy {result['accuracy']:.1%} on {result['rows']} rows, "
+            f"data {result['load_ms']:.1f} ms ({'cached' if result['cached'] else 'parsed CSV'}), "
+            f"predict {result['predict_ms']:.1f} ms ({result['rows_per_s']:,.0f} rows/s)"
+        )
@@ -0,0 +1,124 @@
+import time
+
+import numpy as np
+
+from diagnosis.batch import load_dataset
+from diagnosis.config import CONFIG
+from diagnosis.inference import model_frame
+from diagnosis.registry import registry
+
+# Rows evaluated together; bounds the (rows x trees x classes) leaf-value buffer
+BLOCK_SIZE = 4096
+
+
+class CompiledForest:
+    """A fitted sklearn random forest classifier flattened into NumPy arrays.
+
+    All trees share one node table (feature, threshold, left/right child, missing
+    direction, leaf value) and a batch walks every tree at once, one level per
+    step. Leaves point at themselves, so rows that reach one early just stay put.
+    Thresholds are compared in float64 against float32 inputs and leaf values are
+    summed tree by tree, as sklearn does, so predictions match it exactly.
+    """
+
+    def __init__(self, model):
+        if not hasattr(model, "estimators_") or not hasattr(model, "classes_") or model.n_outputs_ != 1:
+            raise TypeError(f"Can only compile single-output forest classifiers, not {type(model).__name__}")
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        self.roots = offsets[:-1]
+        self.depth = max(tree.max_depth for tree in trees)
+        self.n_features = self.n_features_in_ = model.n_features_in_
+        self.classes = self.classes_ = model.classes_
+        self.n_outputs_ = 1
+        self.feature_names = getattr(model, "feature_names_in_", None)
+        if self.feature_names is not None:
+            # Described like the sklearn model, so it can stand in for it when columns are laid out
+            self.feature_names_in_ = self.feature_names
+
+        left, right, feature, threshold, missing_left, value = [], [], [], [], [], []
+        for offset, tree in zip(self.roots, trees):
+            index = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
+            left.append(np.where(is_leaf, index, tree.children_left + offset))
+            right.append(np.where(is_leaf, index, tree.children_right + offset))
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+            missing_left.append(tree.missing_go_to_left.astype(bool))
+            value.append(tree.value[:, 0, :len(self.classes)])
+        self.left = np.concatenate(left).astype(np.intp)
+        self.right = np.concatenate(right).astype(np.intp)
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold)
+        self.missing_left = np.concatenate(missing_left)
+        self.value = np.concatenate(value)
+
+    def apply(self, X):
+        """Leaf index of every (row, tree) pair for float32 X."""
+        nodes = np.repeat(self.roots[np.newaxis, :], len(X), axis=0)
+        rows = np.arange(len(X))[:, np.newaxis]
+        for _ in range(self.depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = np.where(np.isnan(x), self.missing_left[nodes], x <= self.threshold[nodes])
+            children = np.where(go_left, self.left[nodes], self.right[nodes])
+            if np.array_equal(children, nodes):
+                break
+            nodes = children
+        return nodes
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[-1]} features, but the model is expecting {self.n_features} features as input.")
+        proba = np.empty((len(X), len(self.classes)))
+        for start in range(0, len(X), BLOCK_SIZE):
+            leaves = self.apply(X[start:start + BLOCK_SIZE])
+            # cumsum adds the trees one after another, matching sklearn's accumulation order
+            proba[start:start + BLOCK_SIZE] = np.cumsum(self.value[leaves], axis=1)[:, -1]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes.take(self.predict_proba(X).argmax(axis=1))
+
+
+def verify(disease, model, compiled):
+    """Compare compiled with model on every row of the disease's bundled dataset.
+
+    Returns (rows whose predicted class differs, rows checked).
+    """
+    frame = model_frame(disease, model, load_dataset(disease))
+    expected = model.predict(frame)
+    actual = compiled.predict(frame.to_numpy(dtype=np.float32))
+    return int((expected != actual).sum()), len(frame)
+
+
+def _best_time(function, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_all():
+    """Verify and time the compiled engine for every disease, printing one line each.
+
+    Returns True when every model's predictions matched exactly.
+    """
+    ok = True
+    for disease in CONFIG:
+        # Always the pickled sklearn model, even when the registry serves a memory-mapped copy
+        model = registry.load_pickle(disease)
+        compiled = CompiledForest(model)
+        mismatches, rows = verify(disease, model, compiled)
+        ok = ok and mismatches == 0
+        row = model_frame(disease, model, load_dataset(disease).head(1))
+        sklearn_time = _best_time(lambda: model.predict(row))
+        numpy_time = _best_time(lambda: compiled.predict(row.to_numpy(dtype=np.float32)))
+        print(
+            f"{disease:<20} {'OK' if mismatches == 0 else 'MISMATCH'} {rows - mismatches}/{rows} rows identical, "
+            f"single row {sklearn_time * 1000:.2f} ms (sklearn) vs {numpy_time * 1000:.2f} ms (numpy)"
+        )
+    return ok
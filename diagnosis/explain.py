@@ -0,0 +1,69 @@
+"""Per-prediction feature contributions for the random forest models.
+
+For every node of every tree, ForestExplainer records how the "Detected" class
+probability changed along the path from the root, split by the feature each step
+split on (the path attribution of Saabas, "Interpreting random forests"). That
+table is built once per model, so explaining a row is one tree walk plus a
+gather and a mean: the forest's probability equals bias plus the sum of the
+contributions. Contributions are reported per CONFIG input, with one-hot columns
+folded back into the input they came from.
+"""
+import numpy as np
+
+from diagnosis.config import CONFIG
+from diagnosis.engine import CompiledForest
+from diagnosis.inference import column_sources, model_matrix
+
+# Rows explained together; bounds the (rows x trees x inputs) gather buffer
+BLOCK_SIZE = 256
+
+
+def explainable(model):
+    """Whether model is a forest ForestExplainer can read: a fitted sklearn forest or a CompiledForest."""
+    return isinstance(model, CompiledForest) or (hasattr(model, "estimators_") and hasattr(model, "classes_") and model.n_outputs_ == 1)
+
+
+class ForestExplainer:
+    def __init__(self, disease, model, compiled):
+        self.disease = disease
+        self.model = model
+        self.compiled = compiled
+        self.labels = [input_config["label"] for input_config in CONFIG[disease]["inputs"]]
+        classes = list(compiled.classes)
+        self.positive = classes.index(1) if 1 in classes else len(classes) - 1
+        value = compiled.value[:, self.positive]
+        self.bias = float(value[compiled.roots].mean())
+
+        # Which CONFIG input each fitted column came from
+        source = column_sources(disease, model)
+
+        # Walk all trees one level at a time, handing each child its parent's running total
+        nodes = len(compiled.left)
+        internal = compiled.left != np.arange(nodes)
+        contributions = np.zeros((nodes, len(self.labels)))
+        frontier = compiled.roots[internal[compiled.roots]]
+        while frontier.size:
+            for children in (compiled.left[frontier], compiled.right[frontier]):
+                contributions[children] = contributions[frontier]
+                contributions[children, source[compiled.feature[frontier]]] += value[children] - value[frontier]
+            frontier = np.concatenate([compiled.left[frontier], compiled.right[frontier]])
+            frontier = frontier[internal[frontier]]
+        self.contributions = contributions
+
+    def explain(self, X):
+        """Contributions for a batch: (probabilities, array of rows x CONFIG inputs).
+
+        X holds CONFIG feature values; each row's probability is bias + its contributions.
+        """
+        X = model_matrix(self.disease, self.model, X)
+        result = np.empty((len(X), len(self.labels)))
+        for start in range(0, len(X), BLOCK_SIZE):
+            leaves = self.compiled.apply(X[start:start + BLOCK_SIZE])
+            result[start:start + BLOCK_SIZE] = self.contributions[leaves].mean(axis=1)
+        return self.bias + result.sum(axis=1), result
+
+    def explain_row(self, values):
+        """One row of CONFIG feature values: (probability, [(label, contribution)] largest first)."""
+        probability, contributions = self.explain(np.array([values], dtype=float))
+        order = np.argsort(-np.abs(contributions[0]))
+        return float(probability[0]), [(self.labels[i], float(contributions[0, i])) for i in order]
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+from diagnosis.config import CONFIG
+
+# disease -> (model, column layout) for the single-row fast path
+_layouts = {}
+
+
+def encode_categories(disease, frame):
+    """Replace raw category codes (e.g. "M"/"F") with the numeric values used by the form."""
+    for feature, codes in CONFIG[disease].get("categories", {}).items():
+        if frame[feature].dtype == object:
+            # map rather than replace: replace warns about silently downcasting object columns
+            frame = frame.assign(**{feature: frame[feature].map(lambda value: codes.get(value, value))})
+    return frame
+
+
+def model_frame(disease, model, frame):
+    """One-hot encode categorical features when the model was fitted on pd.get_dummies columns.
+
+    The dummy columns are appended after the other features, exactly as get_dummies
+    did at training time, so sklearn's feature-name check still catches misordering.
+    """
+    fitted = set(getattr(model, "feature_names_in_", ()))
+    for feature, codes in CONFIG[disease].get("categories", {}).items():
+        dummies = {f"{feature}_{code}": value for code, value in sorted(codes.items())}
+        if feature in fitted or not set(dummies) <= fitted:
+            continue
+        values = frame[feature]
+        frame = frame.drop(columns=feature).assign(**{name: values == value for name, value in dummies.items()})
+    return frame
+
+
+def _check_feature_names(disease, model, names):
+    fitted = getattr(model, "feature_names_in_", None)
+    if fitted is not None and list(names) != list(fitted):
+        raise ValueError(
+            f"The feature names should match those that were passed during fit.\n"
+            f"{disease} model was fitted on {list(fitted)}, got {list(names)}"
+        )
+
+
+def predict(disease, model, frame, compiled=None):
+    """Predict a frame of CONFIG features, with the sklearn model or its CompiledForest."""
+    frame = model_frame(disease, model, frame)
+    if compiled is None:
+        return model.predict(frame)
+    _check_feature_names(disease, model, frame.columns)
+    return compiled.predict(frame.to_numpy(dtype=np.float32))
+
+
+def _layout(disease, model):
+    """Work out, once per loaded model, how a row of CONFIG features maps onto the fitted columns.
+
+    Returns (plain, dummies): indices of features passed through unchanged, and
+    (index, value) pairs producing the one-hot columns appended after them, in the
+    order model_frame would build. Raises ValueError like sklearn if the resulting
+    column names do not match the ones the model was fitted on.
+    """
+    cached = _layouts.get(disease)
+    if cached is not None and cached[0] is model:
+        return cached[1]
+    features = CONFIG[disease]["features"]
+    fitted = getattr(model, "feature_names_in_", None)
+    expanded = set()
+    dummies = []
+    names = []
+    for feature, codes in CONFIG[disease].get("categories", {}).items():
+        dummy_names = [f"{feature}_{code}" for code in sorted(codes)]
+        if fitted is None or feature in fitted or not set(dummy_names) <= set(fitted):
+            continue
+        expanded.add(feature)
+        dummies += [(features.index(feature), codes[code]) for code in sorted(codes)]
+        names += dummy_names
+    plain = [index for index, feature in enumerate(features) if feature not in expanded]
+    _check_feature_names(disease, model, [features[index] for index in plain] + names)
+    _layouts[disease] = (model, (plain, dummies))
+    return plain, dummies
+
+
+def model_matrix(disease, model, X):
+    """Turn a 2-D array of CONFIG features into the float32 columns the model was fitted on."""
+    plain, dummies = _layout(disease, model)
+    X = np.asarray(X)
+    columns = [X[:, plain]] + [X[:, [index]] == value for index, value in dummies]
+    return np.hstack(columns).astype(np.float32)
+
+
+def column_sources(disease, model):
+    """For each column the model was fitted on, the index of the CONFIG feature it came from."""
+    plain, dummies = _layout(disease, model)
+    return np.array(list(plain) + [index for index, _ in dummies], dtype=np.intp)
+
+
+def predict_row(disease, model, values, compiled=None):
+    """Predict one row of CONFIG feature values without building a DataFrame.
+
+    Feature names are checked once per loaded model instead of on every call. For
+    random forests the trees are evaluated directly (or by compiled, a CompiledForest
+    of the model), which is what predict does minus its per-call validation and
+    thread-pool dispatch.
+    """
+    if compiled is None and hasattr(model, "roots"):
+        compiled = model  # a CompiledForest evaluates itself
+    if compiled is None and (not hasattr(model, "estimators_") or model.n_outputs_ != 1):
+        return predict(disease, model, pd.DataFrame([values], columns=CONFIG[disease]["features"]))[0]
+    plain, dummies = _layout(disease, model)
+    X = np.array([[values[i] for i in plain] + [values[i] == value for i, value in dummies]], dtype=np.float32)
+    if compiled is not None:
+        return compiled.predict(X)[0]
+    proba = model.estimators_[0].predict_proba(X, check_input=False)
+    for tree in model.estimators_[1:]:
+        proba += tree.predict_proba(X, check_input=False)
+    proba /= len(model.estimators_)
+    return model.classes_[proba[0].argmax()]
+
+
+def result_text(disease, prediction):
+    return f"{disease} Detected" if prediction == 1 else f"No {disease}"
@@ -0,0 +1,167 @@
+"""Process-wide counters and latency histograms in the Prometheus text format.
+
+Stages of the details page, model loads, prediction-cache lookups and API batches
+are recorded here. serve_metrics exposes them (and, when it is running, the
+sampling profiler's flame data) on a local HTTP port; write_metrics dumps them to
+a file instead, and write_metrics_on_exit does so when the process shuts down.
+"""
+import atexit
+import bisect
+import collections
+import http.server
+import threading
+import time
+from contextlib import contextmanager
+
+from diagnosis.registry import registry, resolve_path
+
+# Histogram bucket upper bounds in seconds, from 0.1 ms to 10 s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+class Metrics:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = collections.defaultdict(float)  # (name, labels) -> value
+        self._histograms = {}  # (name, labels) -> [bucket counts, count, sum]
+        self._help = {}
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters[name, _labels(labels)] += amount
+
+    def observe(self, name, seconds, **labels):
+        with self._lock:
+            histogram = self._histograms.get((name, _labels(labels)))
+            if histogram is None:
+                histogram = self._histograms[name, _labels(labels)] = [[0] * len(self.buckets), 0, 0.0]
+            index = bisect.bisect_left(self.buckets, seconds)
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += 1
+            histogram[2] += seconds
+
+    @contextmanager
+    def timer(self, stage, disease=None):
+        """Time a block as one observation of diagnosis_stage_seconds{stage, disease}."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("diagnosis_stage_seconds", time.perf_counter() - start, stage=stage, disease=disease)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, ([*value[0]], value[1], value[2])) for key, value in self._histograms.items())
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            header(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        for (name, labels), (buckets, count, total) in histograms:
+            header(name, "histogram")
+            cumulative = 0
+            for bound, bucket in zip(self.buckets, buckets):
+                cumulative += bucket
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', f'{bound:g}')])} {cumulative}")
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+metrics.describe("diagnosis_stage_seconds", "Time spent in each stage of a page run or request.")
+metrics.describe("diagnosis_model_load_seconds", "Time to load a disease model.")
+metrics.describe("diagnosis_predictions_total", "Predictions served, by disease and source.")
+metrics.describe("diagnosis_prediction_cache_total", "Prediction cache lookups, by disease and outcome.")
+registry.listeners.append(lambda disease: metrics.observe("diagnosis_model_load_seconds", registry.load_times[disease], disease=disease))
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        from diagnosis.profiler import profiler
+
+        if self.path == "/metrics":
+            body, content_type = metrics.render(), "text/plain; version=0.0.4"
+        elif self.path == "/profile" and profiler.running:
+            body, content_type = profiler.folded(), "text/plain"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def serve_metrics(port, address="127.0.0.1"):
+    """Serve /metrics (and /profile) from a daemon thread; only the first call per process binds."""
+    global _server
+    if _server is None:
+        _server = http.server.ThreadingHTTPServer((address, port), _Handler)
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
+
+
+def write_metrics(path):
+    with open(path, "w") as f:
+        f.write(metrics.render())
+
+
+_exit_paths = set()
+
+
+def write_metrics_on_exit(path):
+    """Write the metrics to path (relative to the project root) at interpreter exit.
+
+    When the sampling profiler is running it is stopped and its stacks are written
+    beside it as path + ".folded". Safe to call on every rerun: each path is
+    registered once per process.
+    """
+    path = resolve_path(path)
+    if path not in _exit_paths:
+        _exit_paths.add(path)
+        atexit.register(_write_on_exit, path)
+
+
+def _write_on_exit(path):
+    from diagnosis.profiler import profiler
+
+    if profiler.running:
+        profiler.stop()
+        profiler.write(path + ".folded")
+    write_metrics(path)
@@ -0,0 +1,160 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+
+from diagnosis.config import CONFIG
+
+# Serve the compiled engine from a model's verified .forest file (python -m diagnosis convert-models)
+# when there is one: memory-mapped and shared between processes instead of unpickled into each
+USE_MAPPED_MODELS = True
+
+# Model paths in CONFIG are relative to the project root
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def resolve_path(path):
+    return path if os.path.isabs(path) else os.path.join(BASE_DIR, path)
+
+
+class ModelRegistry:
+    """Process-wide cache of the disease models.
+
+    get() returns the unpickled sklearn model and compiled() its CompiledForest,
+    memory-mapped from the verified .forest copy when there is one, so the compiled
+    engine never has to unpickle. Each is loaded the first time it is requested and
+    kept until the file on disk changes, detected by modification time. Callables
+    added to listeners are called with the disease name whenever a model is loaded.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.listeners = []
+        self.load_times = {}  # disease -> seconds its last load took
+        self.file_hashes = {}  # disease -> sha256 of the model file as loaded
+        self._models = {}  # disease -> (pickle mtime, model)
+        self._preload = None
+        self._compiled = {}  # disease -> ((pickle mtime, .forest mtime), CompiledForest)
+        self._explainers = {}  # disease -> (CompiledForest, ForestExplainer)
+        # Reentrant: compiled() falls back to get() while holding the disease's lock
+        self._locks = {disease: threading.RLock() for disease in config}
+
+    def path(self, disease):
+        return resolve_path(self.config[disease]["model"])
+
+    def _version(self, disease):
+        path = self.path(disease)
+        if not USE_MAPPED_MODELS:
+            return os.stat(path).st_mtime_ns, None
+        try:
+            forest_mtime = os.stat(os.path.splitext(path)[0] + ".forest").st_mtime_ns
+        except FileNotFoundError:
+            forest_mtime = None
+        return os.stat(path).st_mtime_ns, forest_mtime
+
+    def load_pickle(self, disease):
+        """Unpickle disease's model straight from its .sav file, bypassing the cache."""
+        with open(self.path(disease), "rb") as f:
+            return pickle.load(f)
+
+    def get(self, disease):
+        """disease's sklearn model, unpickled from its .sav file."""
+        path = self.path(disease)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._models.get(disease)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        # Only one thread unpickles a given model; others wait and reuse it
+        with self._locks[disease]:
+            cached = self._models.get(disease)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            start = time.perf_counter()
+            with open(path, "rb") as f:
+                data = f.read()
+            model = pickle.loads(data)
+            self.load_times[disease] = time.perf_counter() - start
+            self.file_hashes[disease] = hashlib.sha256(data).hexdigest()
+            self._models[disease] = (mtime, model)
+        for listener in self.listeners:
+            listener(disease)
+        return model
+
+    def compiled(self, disease):
+        """disease's model as a CompiledForest, rebuilt when the model files change.
+
+        This is the verified .forest copy, memory-mapped without touching sklearn, when
+        there is one; otherwise the pickled model is loaded and compiled. Either stands
+        in for the sklearn model wherever its feature names are needed.
+        """
+        from diagnosis.engine import CompiledForest
+
+        version = self._version(disease)
+        cached = self._compiled.get(disease)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._locks[disease]:
+            cached = self._compiled.get(disease)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            forest = None
+            if version[1] is not None:
+                from diagnosis.artifact import load_verified
+
+                start = time.perf_counter()
+                with open(self.path(disease), "rb") as f:
+                    file_hash = hashlib.sha256(f.read()).hexdigest()
+                forest = load_verified(disease, file_hash)
+                if forest is not None:
+                    self.load_times[disease] = time.perf_counter() - start
+                    self.file_hashes[disease] = file_hash
+            mapped = forest is not None
+            if not mapped:
+                forest = CompiledForest(self.get(disease))
+            self._compiled[disease] = (version, forest)
+        if mapped:
+            for listener in self.listeners:
+                listener(disease)
+        return forest
+
+    def explainer(self, disease):
+        """Feature-contribution tables for the current compiled model, rebuilt when it reloads."""
+        from diagnosis.explain import ForestExplainer
+
+        compiled = self.compiled(disease)
+        cached = self._explainers.get(disease)
+        if cached is None or cached[0] is not compiled:
+            cached = (compiled, ForestExplainer(disease, compiled, compiled))
+            self._explainers[disease] = cached
+        return cached[1]
+
+    def preload(self, compiled=False):
+        """Load every model on a background thread, once per process.
+
+        With compiled, the CompiledForests the compiled engine uses are loaded instead
+        of the sklearn models, so verified .forest files spare importing sklearn.
+        """
+        if self._preload is None:
+            self._preload = threading.Thread(target=self._load_all, args=(compiled,), name="model-preload", daemon=True)
+            self._preload.start()
+        return self._preload
+
+    def _load_all(self, compiled):
+        for disease in self.config:
+            try:
+                self.compiled(disease) if compiled else self.get(disease)
+            except OSError:
+                pass  # reported when the disease's page asks for it
+
+    def is_loaded(self, disease):
+        return disease in self._models or disease in self._compiled
+
+    def clear(self):
+        self._models.clear()
+        self._compiled.clear()
+        self._explainers.clear()
+
+
+# Shared by every Streamlit session (and any other entry point) in this process
+registry = ModelRegistry(CONFIG)
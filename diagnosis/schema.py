@@ -0,0 +1,88 @@
+import numpy as np
+
+from diagnosis.config import CONFIG
+
+
+class Schema:
+    """One disease's input rules from CONFIG, compiled into arrays.
+
+    Columns follow CONFIG feature order. Rows are checked column-wise with NumPy,
+    so validating one form submission and a CSV chunk of thousands of rows is the
+    same code path.
+    """
+
+    def __init__(self, disease, config):
+        self.disease = disease
+        self.features = list(config["features"])
+        self.labels = [input_config["label"] for input_config in config["inputs"]]
+        inputs = config["inputs"]
+        self.binary = np.array([input_config["type"] == "selectbox" for input_config in inputs])
+        self.integer = np.array([
+            input_config["type"] == "number" and not isinstance(input_config.get("step", 1), float)
+            for input_config in inputs
+        ])
+        self.minimum = np.array([input_config.get("min_value", -np.inf) for input_config in inputs], dtype=float)
+        self.maximum = np.array([
+            input_config.get("max_value", np.inf) if input_config["type"] == "number" else max(input_config["options"])
+            for input_config in inputs
+        ], dtype=float)
+        self.minimum[self.binary] = [min(input_config["options"]) for input_config in inputs if input_config["type"] == "selectbox"]
+        self.categories = config.get("categories", {})
+
+    def array(self, rows):
+        """Coerce rows of raw values to a float array; category codes are mapped, anything non-numeric becomes NaN."""
+        X = np.full((len(rows), len(self.features)), np.nan)
+        codes = [self.categories.get(feature, {}) for feature in self.features]
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                try:
+                    X[i, j] = float(codes[j].get(value, value) if codes[j] else value)
+                except (TypeError, ValueError):
+                    pass
+        return X
+
+    def check(self, X, zero_is_missing=False):
+        """Validate a 2-D array of feature values column-wise.
+
+        zero_is_missing treats 0 in a numeric column as not filled in, which is
+        what an untouched form field holds. Returns (valid, errors): a boolean
+        mask over rows and {row: [messages]} for the rows that failed.
+        """
+        X = np.asarray(X, dtype=float)
+        missing = np.isnan(X)
+        if zero_is_missing:
+            missing |= (X == 0) & ~self.binary
+        present = ~missing & ~self.binary
+        checks = [
+            (missing, "is missing"),
+            (present & (X < self.minimum), "must be at least {minimum:g}"),
+            (present & (X > self.maximum), "must be at most {maximum:g}"),
+            (present & self.integer & (X != np.round(X)), "must be a whole number"),
+            (~missing & self.binary & (X != self.minimum) & (X != self.maximum), "must be {minimum:g} or {maximum:g}"),
+        ]
+        failed = np.zeros(X.shape, dtype=bool)
+        for mask, _ in checks:
+            failed |= mask
+        valid = ~failed.any(axis=1)
+        # Messages are only built for the failing cells, then listed in column order
+        cells = []
+        for mask, message in checks:
+            for i, j in zip(*np.nonzero(mask)):
+                cells.append((int(i), int(j), message.format(minimum=self.minimum[j], maximum=self.maximum[j])))
+        errors = {}
+        for i, j, text in sorted(cells):
+            errors.setdefault(i, []).append(f"{self.labels[j]} {text}")
+        return valid, errors
+
+    def check_row(self, values, zero_is_missing=False):
+        """Validate one row of values in feature order; returns its error messages."""
+        _, errors = self.check([values], zero_is_missing)
+        return errors.get(0, [])
+
+    def check_rows(self, rows):
+        """Validate rows of raw values (category codes allowed); returns (valid, errors) like check."""
+        return self.check(self.array(rows))
+
+
+# Compiled once at import; every caller shares these
+SCHEMAS = {disease: Schema(disease, config) for disease, config in CONFIG.items()}
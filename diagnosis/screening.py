@@ -0,0 +1,69 @@
+from diagnosis.audit import audit_log
+from diagnosis.batch import resolve_columns
+from diagnosis.config import CONFIG, SHARED_FIELDS
+from diagnosis.inference import predict_row, result_text
+from diagnosis.metrics import metrics
+from diagnosis.registry import registry
+from diagnosis.schema import SCHEMAS
+
+def disease_values(disease, record):
+    """Pick one disease's feature values out of a unified patient record.
+
+    Record keys may be SHARED_FIELDS names or labels, CONFIG feature names or form
+    labels. Returns (values in feature order, labels of the inputs still missing).
+    Raises ValueError when a supplied value breaks the disease's Schema rules.
+    """
+    view = {key: value for key, value in record.items() if value is not None and value != ""}
+    for name, shared in SHARED_FIELDS.items():
+        feature = shared["features"].get(disease)
+        for key in (name, shared["label"]):
+            if feature is not None and key in view:
+                view.setdefault(feature, view[key])
+    mapping, missing = resolve_columns(disease, list(view))
+    if missing:
+        labels = {feature: input_config["label"] for feature, input_config in zip(CONFIG[disease]["features"], CONFIG[disease]["inputs"])}
+        return None, [labels[feature] for feature in missing]
+    schema = SCHEMAS[disease]
+    values = schema.array([[view[mapping[feature]] for feature in schema.features]])
+    errors = schema.check(values)[1]
+    if errors:
+        raise ValueError("; ".join(errors[0]))
+    return values[0].tolist(), []
+
+
+def _predict(disease, values):
+    with metrics.timer("screening_predict", disease):
+        # The compiled engine, as on the details page: about 0.2 ms a row against several ms for sklearn
+        prediction = predict_row(disease, registry.compiled(disease), values)
+    metrics.inc("diagnosis_predictions_total", disease=disease, source="screening")
+    audit_log.record(disease, values, prediction, result_text(disease, prediction), "screening")
+    return prediction
+
+
+def screen(record, diseases=None):
+    """Run every requested disease model the record has enough inputs for.
+
+    The models run one after another: with the compiled engine all seven take about
+    2 ms together, less than handing them to a thread pool costs.
+
+    Returns {disease: result} in request order, where result holds either
+    "prediction" and "result", "missing" (input labels not supplied) or "error".
+    """
+    diseases = list(CONFIG) if diseases is None else diseases
+    results = {}
+    for disease in diseases:
+        try:
+            values, missing = disease_values(disease, record)
+        except ValueError as e:
+            results[disease] = {"error": str(e)}
+            continue
+        if missing:
+            results[disease] = {"missing": missing}
+            continue
+        try:
+            prediction = _predict(disease, values)
+        except Exception as e:
+            results[disease] = {"error": str(e)}
+        else:
+            results[disease] = {"prediction": int(prediction), "result": result_text(disease, prediction)}
+    return results
@@ -0,0 +1,67 @@
+"""Cold-start profile of app.py, measured in a fresh interpreter.
+
+Run with ``python -m diagnosis startup-profile``; the stages mirror what a new
+Streamlit worker pays before each page can be drawn.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from diagnosis.registry import BASE_DIR
+
+# Modules the home page is meant to render without
+HEAVY_MODULES = ("numpy", "pandas", "sklearn")
+
+
+def _measure():
+    stages = []
+
+    def stage(name, function):
+        start = time.perf_counter()
+        result = function()
+        stages.append({"stage": name, "seconds": time.perf_counter() - start, "heavy_loaded": [m for m in HEAVY_MODULES if m in sys.modules]})
+        return result
+
+    sys.path.insert(0, BASE_DIR)
+    os.chdir(BASE_DIR)
+    stage("import streamlit", lambda: __import__("streamlit"))
+    stage("import diagnosis (home page modules)", lambda: [__import__(name) for name in ("diagnosis.cache", "diagnosis.config", "diagnosis.registry")])
+    from streamlit.testing.v1 import AppTest
+
+    from diagnosis.config import CONFIG
+    from diagnosis.registry import registry
+
+    registry.preload = lambda compiled=False: None  # keep model loading out of the render stages
+    app = AppTest.from_file(os.path.join(BASE_DIR, "app.py"), default_timeout=60)
+    stage("first render: home page", app.run)
+    stage("import numpy", lambda: __import__("numpy"))
+    stage("import pandas", lambda: __import__("pandas"))
+    stage("import sklearn.ensemble", lambda: __import__("sklearn.ensemble"))
+    for disease in CONFIG:
+        stage(f"load model: {disease}", lambda: registry.compiled(disease))  # what the app's compiled engine loads
+    disease = next(iter(CONFIG))
+    app.button(key=f"card_{disease}").click()
+    stage(f"first render: {disease} details page", app.run)
+    return stages
+
+
+def profile():
+    """Run the measurement in a fresh interpreter and return its stages."""
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-m", "diagnosis.startup"], capture_output=True, text=True, check=True, cwd=BASE_DIR
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def report(stages):
+    total = sum(stage["seconds"] for stage in stages)
+    for stage in stages:
+        heavy = ", ".join(stage["heavy_loaded"]) or "none"
+        print(f"{stage['stage']:<40} {stage['seconds'] * 1000:8.1f} ms   heavy modules loaded: {heavy}")
+    print(f"{'total':<40} {total * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    print(json.dumps(_measure()))